@@ -5,6 +5,9 @@ from typing import List
 from openai import OpenAI
 from config.settings import settings
 
+# Models that accept a reduced output dimension (text-embedding-ada-002 doesn't)
+DIMENSIONS_SUPPORTED_PREFIX = "text-embedding-3"
+
 
 def get_openai_client() -> OpenAI:
     """Initialize and return OpenAI client."""
@@ -13,22 +16,39 @@ def get_openai_client() -> OpenAI:
     return OpenAI(api_key=settings.openai_api_key)
 
 
-def embed_texts(texts: List[str]) -> List[List[float]]:
+def supports_custom_dimension(model: str) -> bool:
+    """Return True if the model accepts a reduced output dimension."""
+    return model.startswith(DIMENSIONS_SUPPORTED_PREFIX)
+
+
+def embed_texts(texts: List[str], model: str = None, dimension: int = None) -> List[List[float]]:
     """
     Create embeddings for a list of texts using OpenAI.
     
     Args:
         texts: List of text strings to embed.
+        model: Embedding model. If None, uses settings.openai_embedding_model.
+        dimension: Output dimension. Only sent for text-embedding-3 models;
+            other models always return their native dimension.
         
     Returns:
         List of embedding vectors (each is a list of floats).
     """
+    if model is None:
+        model = settings.openai_embedding_model
+    
     client = get_openai_client()
     
+    # The pinned openai client predates the 'dimensions' keyword, so it goes through extra_body
+    extra_body = None
+    if dimension is not None and supports_custom_dimension(model):
+        extra_body = {'dimensions': dimension}
+    
     # OpenAI embeddings API
     response = client.embeddings.create(
-        model=settings.openai_embedding_model,
-        input=texts
+        model=model,
+        input=texts,
+        extra_body=extra_body
     )
     
     # Extract embeddings
@@ -36,15 +56,17 @@ def embed_texts(texts: List[str]) -> List[List[float]]:
     return embeddings
 
 
-def embed_text(text: str) -> List[float]:
+def embed_text(text: str, model: str = None, dimension: int = None) -> List[float]:
     """
     Create embedding for a single text.
     
     Args:
         text: Text string to embed.
+        model: Embedding model. If None, uses settings.openai_embedding_model.
+        dimension: Output dimension for text-embedding-3 models.
         
     Returns:
         Embedding vector as a list of floats.
     """
-    return embed_texts([text])[0]
+    return embed_texts([text], model=model, dimension=dimension)[0]
 
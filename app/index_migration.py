@@ -0,0 +1,222 @@
+"""
+Embedding model migration across versioned Pinecone indexes.
+
+Flow:
+1. start: create a new index for the target model/dimension and mark it pending
+2. re-embed: run the ingestion pipeline into the pending index (Airflow
+   'cv_index_migration' DAG or migrate_index.py), while the active index
+   keeps serving and SHADOW_READ_ENABLED compares both from answer_question
+3. cutover: atomically swap the index pointer to the new index
+4. gc: delete retired indexes
+"""
+from typing import List, Dict, Any
+from app.pdf_loader import process_pdf_to_chunks
+from app.embeddings import embed_texts, supports_custom_dimension
+from app.rag import get_pinecone_client, ensure_pinecone_index, bootstrap_index_pointer
+from app.index_pointer import (
+    load_index_pointer,
+    index_pointer_exists,
+    index_pointer_lock,
+    get_index_pointer_path,
+    new_index_name,
+    set_pending_index,
+    promote_pending_index,
+    retire_pending_index,
+    forget_retired_indexes,
+)
+from config.settings import settings
+
+
+def embed_and_upsert_chunks(chunks: List[Dict[str, Any]], target: Dict[str, Any],
+                            batch_size: int = 100) -> int:
+    """
+    Embed chunks with the target index's model and upsert them into it.
+
+    Args:
+        chunks: Chunk dictionaries from process_pdf_to_chunks().
+        target: Index entry with 'name', 'model' and 'dimension' keys.
+        batch_size: Texts per embedding call and vectors per upsert call.
+
+    Returns:
+        Number of vectors upserted.
+    """
+    texts = [chunk['text'] for chunk in chunks]
+    total_batches = (len(texts) + batch_size - 1) // batch_size
+
+    all_embeddings = []
+    for i in range(0, len(texts), batch_size):
+        batch_embeddings = embed_texts(
+            texts[i:i + batch_size], model=target['model'], dimension=target['dimension']
+        )
+        all_embeddings.extend(batch_embeddings)
+        print(f"  ✓ Embedded batch {i // batch_size + 1}/{total_batches} with {target['model']}")
+
+    vectors = []
+    for chunk, embedding in zip(chunks, all_embeddings):
+        vectors.append({
+            'id': chunk['id'],
+            'values': embedding,
+            'metadata': chunk['metadata']
+        })
+
+    pc = get_pinecone_client()
+    index = pc.Index(target['name'])
+    for i in range(0, len(vectors), batch_size):
+        index.upsert(vectors=vectors[i:i + batch_size])
+        print(f"  ✓ Upserted batch {i // batch_size + 1}/{total_batches} to {target['name']}")
+
+    return len(vectors)
+
+
+def start_migration(model: str = None, dimension: int = None, rebuild: bool = False) -> Dict[str, Any]:
+    """
+    Create a new versioned index for model/dimension and mark it pending.
+
+    The active index is left untouched and keeps serving queries. Its
+    model/dimension come from the index pointer (recorded on first use),
+    so OPENAI_EMBEDDING_MODEL / PINECONE_DIMENSION may already name the target.
+
+    Args:
+        model: Target embedding model. If None, uses settings.openai_embedding_model.
+        dimension: Target dimension. If None, uses settings.pinecone_dimension.
+        rebuild: Allow the active model/dimension, to re-ingest into a fresh
+            index after a change that alters chunk IDs (e.g. PDF_EXTRACTOR).
+
+    Returns:
+        The pending index entry.
+    """
+    if model is None:
+        model = settings.openai_embedding_model
+    if dimension is None:
+        dimension = settings.pinecone_dimension
+
+    bootstrap_index_pointer()
+
+    # Held from the "in progress" check until the pointer names the new index,
+    # so concurrent starts can't each create an index that only one records
+    with index_pointer_lock():
+        pointer = load_index_pointer()
+        if pointer['pending']:
+            raise ValueError(f"Migration to {pointer['pending']['name']} is already in progress")
+
+        active = pointer['active']
+        if active['model'] == model and active['dimension'] == dimension and not rebuild:
+            raise ValueError(
+                f"Active index {active['name']} already uses {model} ({dimension} dims); "
+                f"use rebuild to re-ingest it into a fresh index"
+            )
+        if (dimension != active['dimension'] and active['model'] == model
+                and not supports_custom_dimension(model)):
+            raise ValueError(f"Model {model} only produces {active['dimension']}-dim embeddings")
+
+        target = {'name': new_index_name(), 'model': model, 'dimension': dimension}
+
+        # Create the index before recording it so the pointer never names a missing index
+        ensure_pinecone_index(target['name'], target['dimension'])
+        set_pending_index(target)
+    print(f"Started migration: {active['name']} -> {target['name']} ({model}, {dimension} dims)")
+    return target
+
+
+def reembed_pending_index(pdf_path: str = None) -> int:
+    """
+    Run the ingestion pipeline into the pending index.
+
+    Args:
+        pdf_path: Path to PDF file. If None, uses settings.cv_pdf_path.
+
+    Returns:
+        Number of vectors upserted.
+    """
+    target = bootstrap_index_pointer()['pending']
+    if not target:
+        raise ValueError("No migration in progress; run start first")
+
+    chunks = process_pdf_to_chunks(pdf_path)
+    print(f"Re-embedding {len(chunks)} chunks into {target['name']}...")
+    return embed_and_upsert_chunks(chunks, target)
+
+
+def cutover(force: bool = False, pdf_path: str = None) -> Dict[str, Any]:
+    """
+    Atomically point queries at the pending index.
+
+    The pending index must hold at least as many vectors as the CV currently
+    produces chunks. The active index isn't a useful baseline: ingestion only
+    upserts, so it also holds stale vectors from earlier CV versions.
+
+    Args:
+        force: Cut over without checking the pending index's vector count.
+        pdf_path: Path to PDF file. If None, uses settings.cv_pdf_path.
+
+    Returns:
+        The new active index entry.
+    """
+    with index_pointer_lock():
+        pointer = load_index_pointer()
+        target = pointer['pending']
+        if not target:
+            raise ValueError("No pending index to cut over to")
+
+        if not force:
+            expected_count = len(process_pdf_to_chunks(pdf_path))
+            pc = get_pinecone_client()
+            target_count = pc.Index(target['name']).describe_index_stats().total_vector_count
+            if target_count < expected_count:
+                raise ValueError(
+                    f"Pending index {target['name']} has {target_count} vectors but the CV "
+                    f"currently produces {expected_count} chunks; run reembed first "
+                    f"(vector counts can also lag a few seconds behind upserts)"
+                )
+
+        pointer = promote_pending_index()
+    print(f"Cut over to {pointer['active']['name']}; retired {pointer['retired'][-1]['name']}")
+    return pointer['active']
+
+
+def abort_migration() -> Dict[str, Any]:
+    """
+    Abandon the pending index; it is deleted by the next garbage_collect_indexes().
+
+    Returns:
+        The retired index entry.
+    """
+    pointer = retire_pending_index()
+    print(f"Aborted migration to {pointer['retired'][-1]['name']}")
+    return pointer['retired'][-1]
+
+
+def garbage_collect_indexes() -> List[str]:
+    """
+    Delete retired indexes from Pinecone.
+
+    Only indexes recorded as retired in the pointer are ever deleted, and
+    never without a pointer file.
+
+    Returns:
+        Names of deleted indexes.
+    """
+    if not index_pointer_exists():
+        raise ValueError(f"No index pointer at {get_index_pointer_path()}; refusing to delete indexes")
+
+    pointer = load_index_pointer()
+    protected = {pointer['active']['name']}
+    if pointer['pending']:
+        protected.add(pointer['pending']['name'])
+
+    pc = get_pinecone_client()
+    existing_indexes = [idx.name for idx in pc.list_indexes()]
+
+    collected = []
+    for retired in pointer['retired']:
+        name = retired['name']
+        if name in protected:
+            continue
+        if name in existing_indexes:
+            pc.delete_index(name)
+            print(f"Deleted retired index: {name}")
+        collected.append(name)
+
+    if collected:
+        forget_retired_indexes(collected)
+    return collected
@@ -0,0 +1,310 @@
+"""
+Versioned Pinecone index pointer.
+
+The pointer file records which index serves queries ('active'), which index is
+being re-embedded for a model/dimension change ('pending'), and which indexes
+have been replaced and can be garbage-collected ('retired'). Each entry is a
+dict with 'name', 'model' and 'dimension' keys.
+
+Writes go through a temp file + os.replace, so readers (the API, Airflow tasks)
+always see either the old or the new pointer, never a partial one. Read-modify-
+write updates hold an exclusive lock (index_pointer_lock) so concurrent
+migrations can't both pass the "already in progress" check.
+
+The file is written once on first use (see app.rag.bootstrap_index_pointer),
+freezing the model/dimension the live index was built with; from then on
+OPENAI_EMBEDDING_MODEL / PINECONE_DIMENSION only describe migration targets.
+"""
+import copy
+import fcntl
+import json
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from config.settings import settings, PROJECT_ROOT
+
+# Pinecone index names: lowercase alphanumerics and hyphens, max 45 characters
+MAX_INDEX_NAME_LENGTH = 45
+
+# Suffix appended by new_index_name(), e.g. '-v20240101120000'
+VERSION_SUFFIX_PATTERN = r'-v\d{14}'
+
+# Lock nesting depth per thread, so locked helpers can call each other
+_lock_state = threading.local()
+
+# Parsed pointer cached by file mtime so per-request reads stay cheap
+_pointer_cache = {'mtime': None, 'pointer': None}
+
+
+def _legacy_pointer() -> Dict[str, Any]:
+    """Pointer describing the unversioned index configured via settings."""
+    return {
+        'active': {
+            'name': settings.pinecone_index_name,
+            'model': settings.openai_embedding_model,
+            'dimension': settings.pinecone_dimension
+        },
+        'pending': None,
+        'retired': [],
+        'updated_at': None
+    }
+
+
+def load_index_pointer() -> Dict[str, Any]:
+    """
+    Load the index pointer.
+
+    Falls back to the index configured in settings when no pointer file has
+    been written yet. That fallback is only a guess at how the index was built;
+    callers that serve or migrate should go through
+    app.rag.bootstrap_index_pointer() so it gets verified and recorded.
+
+    Returns:
+        Dictionary with 'active', 'pending', 'retired' and 'updated_at' keys.
+    """
+    path = get_index_pointer_path()
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return _legacy_pointer()
+
+    if _pointer_cache['mtime'] != mtime:
+        with open(path, 'r') as f:
+            pointer = json.load(f)
+        _pointer_cache['mtime'] = mtime
+        _pointer_cache['pointer'] = pointer
+
+    return copy.deepcopy(_pointer_cache['pointer'])
+
+
+def get_index_pointer_path() -> str:
+    """Return the pointer file path; relative settings resolve against the project root."""
+    return os.path.join(PROJECT_ROOT, settings.pinecone_index_pointer_path)
+
+
+def index_pointer_exists() -> bool:
+    """Return True if the pointer file has been written."""
+    return os.path.exists(get_index_pointer_path())
+
+
+@contextmanager
+def index_pointer_lock():
+    """
+    Hold an exclusive lock on the pointer for a read-modify-write.
+
+    Uses flock on a sidecar '.lock' file, so it serializes updates across
+    processes (API, Airflow tasks, migrate_index.py). Re-entrant per thread.
+    """
+    depth = getattr(_lock_state, 'depth', 0)
+    if depth:
+        _lock_state.depth = depth + 1
+        try:
+            yield
+        finally:
+            _lock_state.depth = depth
+        return
+
+    lock_path = get_index_pointer_path() + '.lock'
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        _lock_state.depth = 1
+        try:
+            yield
+        finally:
+            _lock_state.depth = 0
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _write_pointer_file(pointer: Dict[str, Any], overwrite: bool) -> None:
+    """Write pointer via a temp file in the same directory; optionally never overwrite."""
+    path = get_index_pointer_path()
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    pointer = dict(pointer, updated_at=datetime.utcnow().isoformat())
+
+    # Temp file must live in the same directory for os.replace / os.link to be atomic
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.index_pointer.')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(pointer, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        if overwrite:
+            os.replace(tmp_path, path)
+        else:
+            try:
+                # Fails if another process initialized the pointer first
+                os.link(tmp_path, path)
+            except FileExistsError:
+                pass
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def initialize_index_pointer(active: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Record active as the live index, unless a pointer already exists.
+
+    Args:
+        active: Index entry with 'name', 'model' and 'dimension' keys.
+
+    Returns:
+        The pointer on disk (which may have been written by another process).
+    """
+    _write_pointer_file({
+        'active': active,
+        'pending': None,
+        'retired': []
+    }, overwrite=False)
+    return load_index_pointer()
+
+
+def save_index_pointer(pointer: Dict[str, Any]) -> None:
+    """
+    Atomically write the index pointer.
+
+    Args:
+        pointer: Pointer dictionary as returned by load_index_pointer().
+    """
+    _write_pointer_file(pointer, overwrite=True)
+
+
+def get_index_base_name() -> str:
+    """
+    Return the base of versioned index names, derived from settings.pinecone_index_name.
+
+    A version suffix is stripped, so PINECONE_INDEX_NAME may name the active
+    versioned index after a cutover without names growing on each migration.
+    """
+    base = re.sub(r'[^a-z0-9-]', '-', settings.pinecone_index_name.lower())
+    return re.sub(VERSION_SUFFIX_PATTERN + '$', '', base)
+
+
+def new_index_name() -> str:
+    """
+    Build a fresh versioned index name.
+
+    Returns:
+        Name like 'alex-cv-index-v20240101120000'.
+    """
+    suffix = f"-v{datetime.utcnow():%Y%m%d%H%M%S}"
+    return get_index_base_name()[:MAX_INDEX_NAME_LENGTH - len(suffix)].rstrip('-') + suffix
+
+
+def find_versioned_indexes(index_names: List[str]) -> List[str]:
+    """
+    Return the names that look like versioned indexes of this deployment.
+
+    Args:
+        index_names: Index names present in the Pinecone project.
+    """
+    base = get_index_base_name()[:MAX_INDEX_NAME_LENGTH - 16].rstrip('-')
+    pattern = re.compile(re.escape(base) + VERSION_SUFFIX_PATTERN + '$')
+    return [name for name in index_names if pattern.match(name)]
+
+
+def get_active_index() -> Dict[str, Any]:
+    """Return the index entry currently serving queries."""
+    return load_index_pointer()['active']
+
+
+def get_pending_index() -> Optional[Dict[str, Any]]:
+    """Return the index being migrated to, or None if no migration is running."""
+    return load_index_pointer()['pending']
+
+
+def get_ingestion_targets() -> List[Dict[str, Any]]:
+    """
+    Return every index that ingestion should write to.
+
+    While a migration is running, new documents are written to both the
+    active and the pending index so neither falls behind.
+    """
+    pointer = load_index_pointer()
+    targets = [pointer['active']]
+    if pointer['pending']:
+        targets.append(pointer['pending'])
+    return targets
+
+
+def set_pending_index(target: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Record target as the pending index of a new migration.
+
+    Args:
+        target: Index entry with 'name', 'model' and 'dimension' keys.
+
+    Returns:
+        Updated pointer.
+    """
+    with index_pointer_lock():
+        pointer = load_index_pointer()
+        if pointer['pending']:
+            raise ValueError(f"Migration to {pointer['pending']['name']} is already in progress")
+
+        pointer['pending'] = target
+        # Reusing a retired name must not leave it scheduled for deletion
+        pointer['retired'] = [idx for idx in pointer['retired'] if idx['name'] != target['name']]
+        save_index_pointer(pointer)
+    return pointer
+
+
+def promote_pending_index() -> Dict[str, Any]:
+    """
+    Cut over: make the pending index active and retire the previous one.
+
+    Returns:
+        Updated pointer.
+    """
+    with index_pointer_lock():
+        pointer = load_index_pointer()
+        if not pointer['pending']:
+            raise ValueError("No pending index to cut over to")
+
+        pointer['retired'].append(pointer['active'])
+        pointer['active'] = pointer['pending']
+        pointer['pending'] = None
+        save_index_pointer(pointer)
+    return pointer
+
+
+def retire_pending_index() -> Dict[str, Any]:
+    """
+    Abort a migration: retire the pending index without cutting over.
+
+    Returns:
+        Updated pointer.
+    """
+    with index_pointer_lock():
+        pointer = load_index_pointer()
+        if not pointer['pending']:
+            raise ValueError("No pending index to abort")
+
+        pointer['retired'].append(pointer['pending'])
+        pointer['pending'] = None
+        save_index_pointer(pointer)
+    return pointer
+
+
+def forget_retired_indexes(names: List[str]) -> Dict[str, Any]:
+    """
+    Drop deleted indexes from the retired list.
+
+    Args:
+        names: Index names that have been deleted from Pinecone.
+
+    Returns:
+        Updated pointer.
+    """
+    with index_pointer_lock():
+        pointer = load_index_pointer()
+        pointer['retired'] = [idx for idx in pointer['retired'] if idx['name'] not in names]
+        save_index_pointer(pointer)
+    return pointer
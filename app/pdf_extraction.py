@@ -0,0 +1,164 @@
+"""
+Pluggable PDF text extraction with an on-disk result cache.
+
+Extractors return the text of every page (empty pages included, so page
+numbers stay stable). Results are cached by file content hash, extractor
+name and extractor version, so re-running ingestion on an unchanged PDF
+skips parsing entirely.
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import tempfile
+from importlib.metadata import version, PackageNotFoundError
+from typing import Callable, Dict, List
+from config.settings import settings
+
+# Bump when extraction logic changes in a way that alters output
+EXTRACTOR_REVISION = "1"
+
+# Preference order when PDF_EXTRACTOR=auto (fastest first)
+AUTO_EXTRACTOR_ORDER = ['pymupdf', 'pypdf']
+
+
+def _extract_with_pypdf(pdf_path: str) -> List[str]:
+    """Extract page texts using pypdf."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    return [page.extract_text() or '' for page in reader.pages]
+
+
+def _extract_with_pymupdf(pdf_path: str) -> List[str]:
+    """Extract page texts using PyMuPDF (optional, much faster than pypdf)."""
+    import pymupdf
+
+    with pymupdf.open(pdf_path) as doc:
+        return [page.get_text() for page in doc]
+
+
+# name -> (import name used to detect installation, distribution name, extract function)
+EXTRACTORS: Dict[str, tuple] = {
+    'pypdf': ('pypdf', 'pypdf', _extract_with_pypdf),
+    'pymupdf': ('pymupdf', 'pymupdf', _extract_with_pymupdf),
+}
+
+
+def is_extractor_available(name: str) -> bool:
+    """Return True if the extractor's backing library is installed."""
+    module_name = EXTRACTORS[name][0]
+    return importlib.util.find_spec(module_name) is not None
+
+
+def get_available_extractors() -> List[str]:
+    """Return the names of all installed extractors."""
+    return [name for name in EXTRACTORS if is_extractor_available(name)]
+
+
+def resolve_extractor(name: str = None) -> str:
+    """
+    Resolve the extractor to use.
+
+    Args:
+        name: Extractor name or 'auto'. If None, uses settings.pdf_extractor.
+
+    Returns:
+        Name of an installed extractor; falls back to pypdf when the
+        requested backend is not installed.
+    """
+    if name is None:
+        name = settings.pdf_extractor
+
+    if name == 'auto':
+        for candidate in AUTO_EXTRACTOR_ORDER:
+            if is_extractor_available(candidate):
+                return candidate
+        return 'pypdf'
+
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown PDF extractor '{name}'. Choose from: auto, {', '.join(EXTRACTORS)}")
+
+    if not is_extractor_available(name):
+        print(f"PDF extractor '{name}' is not installed, falling back to pypdf")
+        return 'pypdf'
+
+    return name
+
+
+def get_extractor_version(name: str) -> str:
+    """Return the cache version of an extractor: our revision plus the library version."""
+    distribution = EXTRACTORS[name][1]
+    try:
+        library_version = version(distribution)
+    except PackageNotFoundError:
+        library_version = 'unknown'
+    return f"{EXTRACTOR_REVISION}-{library_version}"
+
+
+def hash_file(path: str, block_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_path(cache_dir: str, content_hash: str, name: str) -> str:
+    """Return the cache file path for a PDF/extractor combination."""
+    return os.path.join(cache_dir, f"{content_hash}-{name}-{get_extractor_version(name)}.json")
+
+
+def _write_cache(path: str, page_texts: List[str]) -> None:
+    """Atomically write extracted page texts to the cache."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    # Temp file in the same directory so concurrent readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.pdf_cache.')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(page_texts, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def extract_page_texts(pdf_path: str, extractor: str = None, cache_dir: str = None) -> List[str]:
+    """
+    Extract the text of every page, using the on-disk cache when possible.
+
+    Args:
+        pdf_path: Path to PDF file.
+        extractor: Extractor name or 'auto'. If None, uses settings.pdf_extractor.
+        cache_dir: Cache directory. If None, uses settings.pdf_cache_dir;
+            an empty string disables caching.
+
+    Returns:
+        List of page texts, one entry per page.
+    """
+    name = resolve_extractor(extractor)
+    extract: Callable[[str], List[str]] = EXTRACTORS[name][2]
+
+    if cache_dir is None:
+        cache_dir = settings.pdf_cache_dir
+    if not cache_dir:
+        return extract(pdf_path)
+
+    path = _cache_path(cache_dir, hash_file(pdf_path), name)
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+
+    page_texts = extract(pdf_path)
+    try:
+        _write_cache(path, page_texts)
+    except OSError as e:
+        # A read-only or full cache directory must not break ingestion
+        print(f"Warning: Could not write PDF extraction cache {path}: {e}")
+    return page_texts
@@ -3,14 +3,17 @@ PDF loading and text chunking utilities.
 """
 import hashlib
 from typing import List, Dict
-from pypdf import PdfReader
 from config.settings import settings
+from app.pdf_extraction import extract_page_texts
 
 
 def load_pdf(pdf_path: str = None) -> List[Dict[str, str]]:
     """
     Load PDF and extract text page by page.
     
+    Extraction uses the backend selected by settings.pdf_extractor and is
+    cached on disk by file content hash (see app.pdf_extraction).
+    
     Args:
         pdf_path: Path to PDF file. If None, uses settings.cv_pdf_path.
         
@@ -20,11 +23,9 @@ def load_pdf(pdf_path: str = None) -> List[Dict[str, str]]:
     if pdf_path is None:
         pdf_path = settings.cv_pdf_path
     
-    reader = PdfReader(pdf_path)
     pages = []
     
-    for page_num, page in enumerate(reader.pages, start=1):
-        text = page.extract_text()
+    for page_num, text in enumerate(extract_page_texts(pdf_path), start=1):
         if text.strip():  # Only add non-empty pages
             pages.append({
                 'page_number': page_num,
@@ -1,11 +1,33 @@
 """
 RAG (Retrieval-Augmented Generation) logic.
 """
-from typing import List, Dict, Any
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 from openai import OpenAI
 from pinecone import Pinecone, ServerlessSpec
 from config.settings import settings
 from app.embeddings import embed_text, get_openai_client
+from app.index_pointer import (
+    load_index_pointer,
+    index_pointer_exists,
+    initialize_index_pointer,
+    get_index_pointer_path,
+    find_versioned_indexes,
+)
+
+# Shadow reads run off the request path so they never add user-facing latency
+_shadow_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="shadow-read")
+
+# Bounds queued + running shadow reads; extra requests skip the comparison
+# instead of piling up embedding calls under load
+SHADOW_READ_MAX_PENDING = 8
+_shadow_slots = threading.BoundedSemaphore(SHADOW_READ_MAX_PENDING)
+
+# (index name, dimension) pairs whose real dimension has been checked
+_verified_indexes = set()
 
 
 def get_pinecone_client() -> Pinecone:
@@ -15,76 +37,156 @@ def get_pinecone_client() -> Pinecone:
     return Pinecone(api_key=settings.pinecone_api_key)
 
 
-def ensure_pinecone_index():
+def get_index_dimension(index_name: str) -> Optional[int]:
     """
-    Ensure the Pinecone index exists, create if it doesn't.
-    If index exists with wrong dimension, delete and recreate it.
+    Return the dimension an existing Pinecone index was created with.
+    
+    Args:
+        index_name: Index to describe.
+        
+    Returns:
+        The index dimension, or None if the index doesn't exist.
     """
     pc = get_pinecone_client()
-    
-    # Check if index exists
     existing_indexes = [idx.name for idx in pc.list_indexes()]
+    if index_name not in existing_indexes:
+        return None
+    return pc.describe_index(index_name).dimension
+
+
+def ensure_pinecone_index(index_name: str = None, dimension: int = None):
+    """
+    Ensure a Pinecone index exists, create if it doesn't.
+    
+    An existing index with the wrong dimension is never deleted; changing the
+    embedding model or dimension goes through migrate_index.py instead, which
+    re-embeds into a new versioned index while the old one keeps serving.
+    
+    Args:
+        index_name: Index to check. If None, uses the active index.
+        dimension: Expected dimension. If None, uses the active index's dimension.
+    """
+    if index_name is None or dimension is None:
+        active = bootstrap_index_pointer()['active']
+        index_name = index_name or active['name']
+        dimension = dimension or active['dimension']
     
-    if settings.pinecone_index_name not in existing_indexes:
+    actual_dimension = get_index_dimension(index_name)
+    
+    if actual_dimension is None:
         # Create index if it doesn't exist
+        pc = get_pinecone_client()
         pc.create_index(
-            name=settings.pinecone_index_name,
-            dimension=settings.pinecone_dimension,
+            name=index_name,
+            dimension=dimension,
             metric="cosine",
             spec=ServerlessSpec(
                 cloud="aws",
                 region="us-east-1"  # Adjust region as needed
             )
         )
-        print(f"Created Pinecone index: {settings.pinecone_index_name}")
+        print(f"Created Pinecone index: {index_name}")
+    elif actual_dimension != dimension:
+        raise ValueError(
+            f"Index {index_name} has dimension {actual_dimension}, expected {dimension}. "
+            f"Refusing to recreate it; check the recorded indexes with 'python migrate_index.py status'."
+        )
     else:
-        # Try to check dimension by attempting to query with a test vector
-        # If it fails with dimension mismatch, delete and recreate
-        try:
-            index = pc.Index(settings.pinecone_index_name)
-            # Try a test query with correct dimension to see if it works
-            test_vector = [0.0] * settings.pinecone_dimension
-            index.query(vector=test_vector, top_k=1)
-            print(f"Pinecone index already exists: {settings.pinecone_index_name}")
-        except Exception as e:
-            error_msg = str(e)
-            if "dimension" in error_msg.lower() or "400" in error_msg:
-                print(f"Index {settings.pinecone_index_name} has wrong dimension. Deleting and recreating...")
-                pc.delete_index(settings.pinecone_index_name)
-                # Wait a bit for deletion to complete
-                import time
-                time.sleep(3)
-                pc.create_index(
-                    name=settings.pinecone_index_name,
-                    dimension=settings.pinecone_dimension,
-                    metric="cosine",
-                    spec=ServerlessSpec(
-                        cloud="aws",
-                        region="us-east-1"
-                    )
-                )
-                print(f"Recreated Pinecone index: {settings.pinecone_index_name} with dimension {settings.pinecone_dimension}")
-            else:
-                print(f"Pinecone index already exists: {settings.pinecone_index_name}")
-                raise
-
-
-def query_pinecone(query_embedding: List[float], top_k: int = None) -> List[Dict[str, Any]]:
+        print(f"Pinecone index already exists: {index_name}")
+
+
+def bootstrap_index_pointer() -> Dict[str, Any]:
+    """
+    Return the index pointer, recording it on first use.
+    
+    On deployments without a pointer file, the live index is described by
+    PINECONE_INDEX_NAME / OPENAI_EMBEDDING_MODEL / PINECONE_DIMENSION. Those
+    values are checked against the index's real dimension and then frozen in
+    the pointer, so later env changes only affect migration targets and never
+    the model used to query an existing index.
+    
+    Returns:
+        The index pointer.
+    """
+    if index_pointer_exists():
+        return load_index_pointer()
+    
+    active = load_index_pointer()['active']
+    pc = get_pinecone_client()
+    existing_indexes = [idx.name for idx in pc.list_indexes()]
+    
+    if active['name'] not in existing_indexes:
+        # A missing pointer next to versioned indexes means it was lost (wrong
+        # working directory, wiped data/), not a fresh install; creating an
+        # empty index under PINECONE_INDEX_NAME would silently serve nothing
+        versioned_indexes = find_versioned_indexes(existing_indexes)
+        if versioned_indexes:
+            raise ValueError(
+                f"No index pointer at {get_index_pointer_path()} and index {active['name']} "
+                f"doesn't exist, but versioned indexes do: {', '.join(sorted(versioned_indexes))}. "
+                f"Restore the pointer file, or set PINECONE_INDEX_NAME, OPENAI_EMBEDDING_MODEL and "
+                f"PINECONE_DIMENSION to the active index and run 'python migrate_index.py status'."
+            )
+    else:
+        actual_dimension = pc.describe_index(active['name']).dimension
+        if actual_dimension != active['dimension']:
+            raise ValueError(
+                f"Index {active['name']} was built with dimension {actual_dimension}, but "
+                f"PINECONE_DIMENSION is {active['dimension']}. Restore OPENAI_EMBEDDING_MODEL and "
+                f"PINECONE_DIMENSION to the values the index was built with and run "
+                f"'python migrate_index.py status' to record them, then migrate with "
+                f"'python migrate_index.py start --model <model> --dimension <dimension>'."
+            )
+    
+    ensure_pinecone_index(active['name'], active['dimension'])
+    pointer = initialize_index_pointer(active)
+    print(f"Recorded index pointer: {pointer['active']['name']} "
+          f"({pointer['active']['model']}, {pointer['active']['dimension']} dims)")
+    return pointer
+
+
+def verify_serving_index(index: Dict[str, Any]):
+    """
+    Check once per process that an index has the dimension recorded for it.
+    
+    Raises instead of querying with embeddings the index can't match.
+    
+    Args:
+        index: Index entry with 'name', 'model' and 'dimension' keys.
+    """
+    key = (index['name'], index['dimension'])
+    if key in _verified_indexes:
+        return
+    
+    actual_dimension = get_index_dimension(index['name'])
+    if actual_dimension != index['dimension']:
+        raise ValueError(
+            f"Index {index['name']} has dimension {actual_dimension}, but the index pointer "
+            f"records {index['dimension']}; refusing to serve queries from it."
+        )
+    _verified_indexes.add(key)
+
+
+def query_pinecone(query_embedding: List[float], top_k: int = None,
+                   index_name: str = None) -> List[Dict[str, Any]]:
     """
     Query Pinecone for similar chunks.
     
     Args:
         query_embedding: Embedding vector of the query.
         top_k: Number of results to return.
+        index_name: Index to query. If None, uses the active index.
         
     Returns:
         List of matching chunks with metadata.
     """
     if top_k is None:
         top_k = settings.top_k
+    if index_name is None:
+        index_name = bootstrap_index_pointer()['active']['name']
     
     pc = get_pinecone_client()
-    index = pc.Index(settings.pinecone_index_name)
+    index = pc.Index(index_name)
     
     # Query Pinecone
     results = index.query(
@@ -107,6 +209,49 @@ def query_pinecone(query_embedding: List[float], top_k: int = None) -> List[Dict
     return chunks
 
 
+def shadow_read(question: str, shadow_index: Dict[str, Any],
+                primary_chunks: List[Dict[str, Any]], primary_ms: float,
+                question_embedding: List[float] = None, embed_ms: float = 0.0):
+    """
+    Run the retrieval step against the pending index and log how it compares
+    with the active index (latency and overlap of retrieved chunk IDs).
+    
+    Chunk IDs are derived from page/chunk content, so the same chunk has the
+    same ID in both indexes regardless of the embedding model.
+    
+    Args:
+        question: User's question.
+        shadow_index: Pending index entry from the index pointer.
+        primary_chunks: Chunks retrieved from the active index.
+        primary_ms: Embedding + query latency of the active index in ms.
+        question_embedding: Reused when both indexes share model and dimension.
+        embed_ms: Time spent creating a reused question_embedding, added to the
+            shadow latency so both numbers cover embedding + query.
+    """
+    try:
+        start = time.perf_counter()
+        if question_embedding is None:
+            question_embedding = embed_text(
+                question, model=shadow_index['model'], dimension=shadow_index['dimension']
+            )
+            embed_ms = 0.0
+        shadow_chunks = query_pinecone(question_embedding, index_name=shadow_index['name'])
+        shadow_ms = (time.perf_counter() - start) * 1000 + embed_ms
+        
+        primary_ids = [chunk['id'] for chunk in primary_chunks]
+        shadow_ids = [chunk['id'] for chunk in shadow_chunks]
+        overlap = len(set(primary_ids) & set(shadow_ids)) / max(len(primary_ids), len(shadow_ids), 1)
+        
+        print(
+            f"[shadow-read] shadow={shadow_index['name']} "
+            f"primary_ms={primary_ms:.1f} shadow_ms={shadow_ms:.1f} "
+            f"overlap@{settings.top_k}={overlap:.2f} "
+            f"top1_match={primary_ids[:1] == shadow_ids[:1]}"
+        )
+    except Exception as e:
+        print(f"[shadow-read] Failed against {shadow_index['name']}: {e}")
+
+
 def answer_question(question: str) -> Dict[str, Any]:
     """
     Answer a question using RAG flow:
@@ -122,11 +267,35 @@ def answer_question(question: str) -> Dict[str, Any]:
     Returns:
         Dictionary with 'answer', 'sources', and 'chunks' keys.
     """
+    pointer = bootstrap_index_pointer()
+    active_index = pointer['active']
+    verify_serving_index(active_index)
+    start = time.perf_counter()
+    
     # Step 1: Create embedding for the question
-    question_embedding = embed_text(question)
+    question_embedding = embed_text(
+        question, model=active_index['model'], dimension=active_index['dimension']
+    )
+    embed_ms = (time.perf_counter() - start) * 1000
     
     # Step 2: Query Pinecone for similar chunks
-    retrieved_chunks = query_pinecone(question_embedding)
+    retrieved_chunks = query_pinecone(question_embedding, index_name=active_index['name'])
+    primary_ms = (time.perf_counter() - start) * 1000
+    
+    # Optionally compare against the index being migrated to
+    shadow_index = pointer['pending']
+    if (settings.shadow_read_enabled and shadow_index
+            and random.random() < settings.shadow_read_sample_rate
+            and _shadow_slots.acquire(blocking=False)):
+        same_embedding = (
+            (shadow_index['model'], shadow_index['dimension'])
+            == (active_index['model'], active_index['dimension'])
+        )
+        future = _shadow_executor.submit(
+            shadow_read, question, shadow_index, retrieved_chunks, primary_ms,
+            question_embedding if same_embedding else None, embed_ms
+        )
+        future.add_done_callback(lambda _: _shadow_slots.release())
     
     if not retrieved_chunks:
         return {
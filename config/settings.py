@@ -10,6 +10,9 @@ from dotenv import load_dotenv
 # Load .env file if it exists
 load_dotenv()
 
+# Repository root; relative state file paths resolve against it
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -25,8 +28,19 @@ class Settings(BaseSettings):
     pinecone_index_name: str = os.getenv("PINECONE_INDEX_NAME", "alex_cv_index")
     pinecone_dimension: int = int(os.getenv("PINECONE_DIMENSION", "1536"))  # text-embedding-3-small dimension
     
+    # Index Versioning Configuration
+    # Pointer file recording which versioned index is live; once it exists it
+    # takes precedence over PINECONE_INDEX_NAME / OPENAI_EMBEDDING_MODEL for queries
+    # Relative paths resolve against PROJECT_ROOT, not the working directory
+    pinecone_index_pointer_path: str = os.getenv("PINECONE_INDEX_POINTER_PATH", "data/index_pointer.json")
+    shadow_read_enabled: bool = os.getenv("SHADOW_READ_ENABLED", "false").lower() == "true"
+    shadow_read_sample_rate: float = float(os.getenv("SHADOW_READ_SAMPLE_RATE", "1.0"))  # Fraction of requests shadowed
+    
     # PDF Configuration
     cv_pdf_path: str = os.getenv("CV_PDF_PATH", "/Users/alexsandersilveira/Downloads/cv/Profile (6).pdf")
+    # pypdf, pymupdf or auto (fastest installed); changing it changes chunk IDs, so rebuild the index
+    pdf_extractor: str = os.getenv("PDF_EXTRACTOR", "pypdf")
+    pdf_cache_dir: str = os.getenv("PDF_CACHE_DIR", "data/pdf_cache")  # Empty string disables caching
     
     # Chunking Configuration
     chunk_size: int = int(os.getenv("CHUNK_SIZE", "500"))
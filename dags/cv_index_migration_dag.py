@@ -0,0 +1,79 @@
+"""
+Airflow DAG for embedding model migrations.
+
+This DAG (manual trigger only):
+1. Creates a new versioned Pinecone index for the target model/dimension
+2. Re-embeds the CV into it with the regular ingestion pipeline
+
+The active index keeps serving queries throughout. Cut over and garbage-collect
+with migrate_index.py once shadow reads look good.
+
+Trigger with optional config:
+    {"model": "text-embedding-3-large", "dimension": 3072}
+"""
+from datetime import datetime, timedelta
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+from app.index_migration import start_migration, reembed_pending_index
+
+
+def start_index_migration(**context):
+    """
+    Task 1: Create the target index and mark it pending.
+    Model/dimension come from dag_run.conf, falling back to settings.
+    """
+    conf = context['dag_run'].conf or {}
+    dimension = conf.get('dimension')
+    target = start_migration(
+        model=conf.get('model'),
+        dimension=int(dimension) if dimension else None
+    )
+    return target['name']
+
+
+def reembed_into_pending_index(**context):
+    """
+    Task 2: Extract, chunk and embed the CV into the pending index.
+    """
+    upserted = reembed_pending_index()
+    print(f"Re-embedded {upserted} vectors into pending index")
+    return upserted
+
+
+# Define DAG
+default_args = {
+    'owner': 'data_engineer',
+    'depends_on_past': False,
+    'email_on_failure': False,
+    'email_on_retry': False,
+    'retries': 1,
+    'retry_delay': timedelta(minutes=5),
+}
+
+dag = DAG(
+    'cv_index_migration',
+    default_args=default_args,
+    description='Re-embed the CV into a new versioned Pinecone index',
+    schedule_interval=None,  # Manual triggers only
+    start_date=datetime(2024, 1, 1),
+    catchup=False,
+    tags=['rag', 'cv', 'embeddings', 'pinecone', 'migration'],
+)
+
+# Task 1: Create target index
+start_task = PythonOperator(
+    task_id='start_index_migration',
+    python_callable=start_index_migration,
+    retries=0,  # A retry would find the migration already in progress
+    dag=dag,
+)
+
+# Task 2: Re-embed into target index
+reembed_task = PythonOperator(
+    task_id='reembed_into_pending_index',
+    python_callable=reembed_into_pending_index,
+    dag=dag,
+)
+
+# Set task dependencies
+start_task >> reembed_task
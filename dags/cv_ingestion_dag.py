@@ -10,8 +10,9 @@ from datetime import datetime, timedelta
 from airflow import DAG
 from airflow.operators.python import PythonOperator
 from app.pdf_loader import process_pdf_to_chunks
-from app.embeddings import embed_texts
-from app.rag import get_pinecone_client, ensure_pinecone_index
+from app.rag import ensure_pinecone_index, bootstrap_index_pointer
+from app.index_pointer import get_ingestion_targets
+from app.index_migration import embed_and_upsert_chunks
 from config.settings import settings
 
 
@@ -42,43 +43,17 @@ def embed_and_upsert_to_pinecone(**context):
     
     print(f"Processing {len(chunks)} chunks for embedding...")
     
-    # Extract texts for embedding
-    texts = [chunk['text'] for chunk in chunks]
+    # Write to the active index, plus the pending one while a migration runs;
+    # the first run records the live index's model/dimension in the pointer
+    bootstrap_index_pointer()
+    total_upserted = 0
+    for target in get_ingestion_targets():
+        ensure_pinecone_index(target['name'], target['dimension'])
+        upserted = embed_and_upsert_chunks(chunks, target)
+        print(f"Successfully upserted {upserted} vectors to Pinecone index: {target['name']}")
+        total_upserted += upserted
     
-    # Create embeddings in batches (OpenAI handles batching, but we can be explicit)
-    batch_size = 100
-    all_embeddings = []
-    
-    for i in range(0, len(texts), batch_size):
-        batch_texts = texts[i:i + batch_size]
-        batch_embeddings = embed_texts(batch_texts)
-        all_embeddings.extend(batch_embeddings)
-        print(f"Embedded batch {i // batch_size + 1}/{(len(texts) + batch_size - 1) // batch_size}")
-    
-    # Ensure Pinecone index exists
-    ensure_pinecone_index()
-    
-    # Prepare vectors for Pinecone
-    vectors = []
-    for chunk, embedding in zip(chunks, all_embeddings):
-        vectors.append({
-            'id': chunk['id'],
-            'values': embedding,
-            'metadata': chunk['metadata']
-        })
-    
-    # Upsert to Pinecone in batches
-    pc = get_pinecone_client()
-    index = pc.Index(settings.pinecone_index_name)
-    
-    upsert_batch_size = 100
-    for i in range(0, len(vectors), upsert_batch_size):
-        batch_vectors = vectors[i:i + upsert_batch_size]
-        index.upsert(vectors=batch_vectors)
-        print(f"Upserted batch {i // upsert_batch_size + 1}/{(len(vectors) + upsert_batch_size - 1) // upsert_batch_size}")
-    
-    print(f"Successfully upserted {len(vectors)} vectors to Pinecone index: {settings.pinecone_index_name}")
-    return len(vectors)
+    return total_upserted
 
 
 # Define DAG
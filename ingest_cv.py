@@ -6,8 +6,9 @@ Usage:
     python ingest_cv.py
 """
 from app.pdf_loader import process_pdf_to_chunks
-from app.embeddings import embed_texts
-from app.rag import get_pinecone_client, ensure_pinecone_index
+from app.rag import ensure_pinecone_index, bootstrap_index_pointer
+from app.index_pointer import get_ingestion_targets
+from app.index_migration import embed_and_upsert_chunks
 from config.settings import settings
 
 
@@ -22,48 +23,22 @@ def main():
     chunks = process_pdf_to_chunks()
     print(f"✓ Created {len(chunks)} chunks from PDF")
     
-    # Step 2: Create embeddings
-    print(f"\n[Step 2] Creating embeddings for {len(chunks)} chunks...")
-    texts = [chunk['text'] for chunk in chunks]
+    # Step 2: Resolve target indexes (active, plus pending during a migration);
+    # the first run records the live index's model/dimension in the pointer
+    bootstrap_index_pointer()
+    targets = get_ingestion_targets()
+    print(f"\n[Step 2] Target indexes: {', '.join(target['name'] for target in targets)}")
+    
+    for target in targets:
+        # Step 3: Ensure Pinecone index exists
+        print(f"\n[Step 3] Ensuring Pinecone index {target['name']} exists...")
+        ensure_pinecone_index(target['name'], target['dimension'])
+        
+        # Step 4: Embed and upsert to Pinecone
+        print(f"\n[Step 4] Embedding and upserting {len(chunks)} chunks with {target['model']}...")
+        upserted = embed_and_upsert_chunks(chunks, target)
+        print(f"\n✓ Successfully upserted {upserted} vectors to Pinecone index: {target['name']}")
     
-    # Create embeddings in batches
-    batch_size = 100
-    all_embeddings = []
-    
-    for i in range(0, len(texts), batch_size):
-        batch_texts = texts[i:i + batch_size]
-        batch_embeddings = embed_texts(batch_texts)
-        all_embeddings.extend(batch_embeddings)
-        print(f"  ✓ Embedded batch {i // batch_size + 1}/{(len(texts) + batch_size - 1) // batch_size}")
-    
-    print(f"✓ Created {len(all_embeddings)} embeddings")
-    
-    # Step 3: Ensure Pinecone index exists
-    print(f"\n[Step 3] Ensuring Pinecone index exists...")
-    ensure_pinecone_index()
-    
-    # Step 4: Upsert to Pinecone
-    print(f"\n[Step 4] Upserting vectors to Pinecone...")
-    pc = get_pinecone_client()
-    index = pc.Index(settings.pinecone_index_name)
-    
-    # Prepare vectors
-    vectors = []
-    for chunk, embedding in zip(chunks, all_embeddings):
-        vectors.append({
-            'id': chunk['id'],
-            'values': embedding,
-            'metadata': chunk['metadata']
-        })
-    
-    # Upsert in batches
-    upsert_batch_size = 100
-    for i in range(0, len(vectors), upsert_batch_size):
-        batch_vectors = vectors[i:i + upsert_batch_size]
-        index.upsert(vectors=batch_vectors)
-        print(f"  ✓ Upserted batch {i // upsert_batch_size + 1}/{(len(vectors) + upsert_batch_size - 1) // upsert_batch_size}")
-    
-    print(f"\n✓ Successfully upserted {len(vectors)} vectors to Pinecone index: {settings.pinecone_index_name}")
     print("\n" + "=" * 60)
     print("Ingestion complete! You can now start the FastAPI app to query your CV.")
     print("=" * 60)
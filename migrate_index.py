@@ -0,0 +1,79 @@
+"""
+Embedding model migration script.
+Re-embeds the CV into a new versioned Pinecone index without downtime.
+
+Usage:
+    python migrate_index.py status
+    python migrate_index.py start [--model MODEL] [--dimension DIM] [--rebuild]
+    python migrate_index.py reembed
+    python migrate_index.py cutover [--force]
+    python migrate_index.py abort
+    python migrate_index.py gc
+
+Order of operations:
+1. Leave OPENAI_EMBEDDING_MODEL / PINECONE_DIMENSION at the values the live
+   index was built with until the index pointer exists. It is recorded by
+   'status', API startup or the first ingestion run; after that the pointer,
+   not the env, decides which model queries use.
+2. start --model/--dimension (defaults to the env, so the env may be updated
+   to the new model once the pointer exists), then reembed.
+3. Optionally set SHADOW_READ_ENABLED=true on the API to log latency and
+   retrieval overlap of the pending index against the active one.
+4. cutover, then set PINECONE_INDEX_NAME, OPENAI_EMBEDDING_MODEL and
+   PINECONE_DIMENSION to the new active index (they describe it should the
+   pointer file ever be lost; gc deletes the old one), then gc.
+"""
+import argparse
+import json
+from app.rag import bootstrap_index_pointer
+from app.index_migration import (
+    start_migration,
+    reembed_pending_index,
+    cutover,
+    abort_migration,
+    garbage_collect_indexes,
+)
+
+
+def main():
+    """Main migration function."""
+    parser = argparse.ArgumentParser(description="Migrate the CV index to a new embedding model")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('status', help="Show (and on first run record) active, pending and retired indexes")
+
+    start_parser = subparsers.add_parser('start', help="Create a pending index for a new model")
+    start_parser.add_argument('--model', help="Embedding model (default: OPENAI_EMBEDDING_MODEL)")
+    start_parser.add_argument('--dimension', type=int, help="Dimension (default: PINECONE_DIMENSION)")
+    start_parser.add_argument('--rebuild', action='store_true',
+                              help="Allow the active model/dimension (e.g. after changing PDF_EXTRACTOR)")
+
+    subparsers.add_parser('reembed', help="Ingest the CV into the pending index")
+
+    cutover_parser = subparsers.add_parser('cutover', help="Point queries at the pending index")
+    cutover_parser.add_argument('--force', action='store_true',
+                                help="Skip the vector count check")
+
+    subparsers.add_parser('abort', help="Retire the pending index without cutting over")
+    subparsers.add_parser('gc', help="Delete retired indexes")
+
+    args = parser.parse_args()
+
+    if args.command == 'status':
+        print(json.dumps(bootstrap_index_pointer(), indent=2))
+    elif args.command == 'start':
+        start_migration(model=args.model, dimension=args.dimension, rebuild=args.rebuild)
+    elif args.command == 'reembed':
+        upserted = reembed_pending_index()
+        print(f"✓ Re-embedded {upserted} vectors into pending index")
+    elif args.command == 'cutover':
+        cutover(force=args.force)
+    elif args.command == 'abort':
+        abort_migration()
+    elif args.command == 'gc':
+        deleted = garbage_collect_indexes()
+        print(f"✓ Garbage-collected {len(deleted)} index(es)")
+
+
+if __name__ == "__main__":
+    main()